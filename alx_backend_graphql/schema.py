@@ -6,10 +6,7 @@ class Query(CRMQuery, graphene.ObjectType):
     """
     Root query for the GraphQL API.
     """
-    hello = graphene.String(default_value="Hello, GraphQL!")
-
-    def resolve_hello(self, info):
-        return "Hello, GraphQL from CRM!"
+    pass
 
 
 class Mutation(CRMMutation, graphene.ObjectType):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from celery.schedules import crontab
 
@@ -128,6 +129,19 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Graphene Configuration
+GRAPHENE = {
+    'SCHEMA': 'alx_backend_graphql.schema.schema',
+    'MIDDLEWARE': [
+        'crm.loaders.LoadersMiddleware',
+    ],
+}
+
+# Shared secret the cron scripts send to /graphql/internal/ in the
+# X-CRM-Internal-Token header. While it is empty, that endpoint only serves
+# loopback clients; set it when a proxy on this host forwards outside traffic
+CRM_INTERNAL_TOKEN = os.environ.get('CRM_INTERNAL_TOKEN', '')
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -0,0 +1,48 @@
+"""
+Sample customers and products shared by the seed scripts.
+
+Built once at import, so repeated seeding (e.g. call_command('seed_db')
+in a test run) reuses these Decimal prices instead of re-parsing them.
+"""
+from decimal import Decimal
+
+CUSTOMERS = (
+    {'name': 'Alice Johnson', 'email': 'alice.johnson@example.com', 'phone': '+1234567890'},
+    {'name': 'Bob Smith', 'email': 'bob.smith@example.com', 'phone': '123-456-7890'},
+    {'name': 'Carol Williams', 'email': 'carol.williams@example.com', 'phone': '+1987654321'},
+    {'name': 'David Brown', 'email': 'david.brown@example.com', 'phone': '987-654-3210'},
+    {'name': 'Eva Davis', 'email': 'eva.davis@example.com', 'phone': '+1122334455'},
+    {'name': 'Frank Miller', 'email': 'frank.miller@example.com', 'phone': '555-123-4567'},
+    {'name': 'Grace Wilson', 'email': 'grace.wilson@example.com', 'phone': '+1999888777'},
+    {'name': 'Henry Taylor', 'email': 'henry.taylor@example.com', 'phone': '444-555-6666'},
+    {'name': 'Ivy Anderson', 'email': 'ivy.anderson@example.com', 'phone': '+1777666555'},
+    {'name': 'Jack Thomas', 'email': 'jack.thomas@example.com', 'phone': '333-222-1111'},
+    {'name': 'Karen White', 'email': 'karen.white@example.com', 'phone': '+1555444333'},
+    {'name': 'Liam Garcia', 'email': 'liam.garcia@example.com', 'phone': '666-777-8888'},
+    {'name': 'Mia Rodriguez', 'email': 'mia.rodriguez@example.com', 'phone': '+1888999000'},
+    {'name': 'Noah Martinez', 'email': 'noah.martinez@example.com', 'phone': '111-222-3333'},
+    {'name': 'Olivia Hernandez', 'email': 'olivia.hernandez@example.com', 'phone': '+1444555666'},
+)
+
+PRODUCTS = (
+    {'name': 'MacBook Pro 16"', 'price': Decimal('2499.99'), 'stock': 15},
+    {'name': 'Dell XPS 13', 'price': Decimal('1299.99'), 'stock': 25},
+    {'name': 'iPhone 15 Pro', 'price': Decimal('999.99'), 'stock': 50},
+    {'name': 'Samsung Galaxy S24', 'price': Decimal('899.99'), 'stock': 40},
+    {'name': 'iPad Air', 'price': Decimal('599.99'), 'stock': 30},
+    {'name': 'AirPods Pro', 'price': Decimal('249.99'), 'stock': 100},
+    {'name': 'Sony WH-1000XM5', 'price': Decimal('399.99'), 'stock': 20},
+    {'name': 'Microsoft Surface Pro', 'price': Decimal('1199.99'), 'stock': 18},
+    {'name': 'Apple Watch Series 9', 'price': Decimal('429.99'), 'stock': 35},
+    {'name': 'Nintendo Switch OLED', 'price': Decimal('349.99'), 'stock': 45},
+    {'name': 'LG 27" 4K Monitor', 'price': Decimal('449.99'), 'stock': 12},
+    {'name': 'Logitech MX Master 3', 'price': Decimal('99.99'), 'stock': 60},
+    {'name': 'Mechanical Keyboard', 'price': Decimal('159.99'), 'stock': 25},
+    {'name': 'Webcam HD 1080p', 'price': Decimal('79.99'), 'stock': 40},
+    {'name': 'Bluetooth Speaker', 'price': Decimal('129.99'), 'stock': 55},
+    {'name': 'Gaming Mouse', 'price': Decimal('89.99'), 'stock': 70},
+    {'name': 'USB-C Hub', 'price': Decimal('49.99'), 'stock': 80},
+    {'name': 'Wireless Charger', 'price': Decimal('39.99'), 'stock': 90},
+    {'name': 'External SSD 1TB', 'price': Decimal('149.99'), 'stock': 35},
+    {'name': 'Phone Case', 'price': Decimal('24.99'), 'stock': 200},
+)
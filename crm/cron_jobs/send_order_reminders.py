@@ -2,17 +2,29 @@
 """
 Order Reminders Script
 
-This script uses the gql library to query the GraphQL endpoint for orders placed 
+This script posts a prebuilt query to the GraphQL endpoint for orders placed 
 within the last 7 days and logs each order's ID and customer email for reminder purposes.
+When CRM_GRAPHQL_URLS lists several endpoints, the shards are queried concurrently.
 """
 
+import asyncio
+import logging
 import os
 import sys
 import django
-from datetime import datetime, timedelta
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from django.conf import settings
+from datetime import datetime, timedelta, timezone
+from logging.handlers import RotatingFileHandler
+from operator import itemgetter
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - fall back to the sync client
+    aiohttp = None
 
 # Add the project root to Python path and setup Django
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,98 +35,221 @@ sys.path.append(project_root)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
 django.setup()
 
-def setup_graphql_client():
-    """Setup and return a GraphQL client with CSRF handling."""
-    # Create a session to handle cookies and CSRF
-    session = requests.Session()
-    
-    # Get CSRF token by making a GET request first
-    get_response = session.get("http://localhost:8000/graphql/")
-    csrf_token = session.cookies.get('csrftoken')
-    
-    # Setup headers with CSRF token
-    headers = {
-        'X-CSRFToken': csrf_token,
-        'Referer': 'http://localhost:8000/graphql/',
-    }
-    
-    # Create transport with the headers and use the session's cookies
-    transport = RequestsHTTPTransport(
-        url="http://localhost:8000/graphql/",
-        use_json=True,
-        headers=headers,
-        cookies=session.cookies
-    )
-    
-    return Client(transport=transport, fetch_schema_from_transport=False)
+# CSRF-exempt endpoint reserved for server-local scripts
+GRAPHQL_URL = "http://localhost:8000/graphql/internal/"
 
-def get_recent_orders():
-    """Query GraphQL for orders placed within the last 7 days."""
-    # Calculate date 7 days ago
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    seven_days_ago_iso = seven_days_ago.isoformat()
-    
-    # GraphQL query for recent orders
-    query = gql("""
-        query GetRecentOrders($orderDateGte: DateTime!) {
-            filteredOrders(orderDateGte: $orderDateGte) {
-                id
-                orderDate
-                totalAmount
-                customer {
+# One endpoint per shard/tenant, comma-separated; defaults to the local server
+GRAPHQL_URLS = [
+    url.strip()
+    for url in os.environ.get('CRM_GRAPHQL_URLS', GRAPHQL_URL).split(',')
+    if url.strip()
+]
+
+LOG_FILE = "/tmp/order_reminders_log.txt"
+
+# Reminder lines carry their own batch prefix, so the handler writes messages as-is
+logger = logging.getLogger('crm.order_reminders')
+if not logger.handlers:
+    _handler = RotatingFileHandler(LOG_FILE, maxBytes=10_000_000, backupCount=3, delay=True)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    _handler.setLevel(logging.INFO)
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Module-level session so repeated queries share pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+))
+
+# Checked by crm.views.internal_only on /graphql/internal/
+INTERNAL_HEADERS = (
+    {'X-CRM-Internal-Token': settings.CRM_INTERNAL_TOKEN}
+    if settings.CRM_INTERNAL_TOKEN else {}
+)
+_SESSION.headers.update(INTERNAL_HEADERS)
+
+REQUEST_TIMEOUT = 10
+
+# Upper bound on requests in flight across all shards
+MAX_CONCURRENT_REQUESTS = 10
+
+# graphene-django caps `first` at RELAY_CONNECTION_MAX_LIMIT (100 by default)
+PAGE_SIZE = 100
+
+# GraphQL query for recent orders (only the fields that get logged)
+ORDERS_QUERY = """
+    query GetRecentOrders($orderDateGte: DateTime!, $first: Int!, $after: String) {
+        orders(orderDateGte: $orderDateGte, first: $first, after: $after) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            edges {
+                node {
                     id
-                    name
-                    email
+                    customer {
+                        email
+                    }
                 }
             }
         }
-    """)
+    }
+"""
+
+def execute_query(query, variables, url=GRAPHQL_URL):
+    """POST a query string over the shared session and return its data."""
+    response = _SESSION.post(
+        url,
+        json={"query": query, "variables": variables},
+        timeout=REQUEST_TIMEOUT,
+    )
+    if not response.headers.get('Content-Type', '').startswith('application/json'):
+        # A proxy's HTML error page (502/504) would only fail to decode;
+        # report its HTTP status and URL instead
+        response.raise_for_status()
+    # orjson decodes straight from bytes, well ahead of stdlib json
+    body = orjson.loads(response.content)
+    if body.get('errors'):
+        raise Exception(body['errors'][0].get('message'))
+    response.raise_for_status()
+    return body['data']
+
+def recent_orders_cutoff(days=7):
+    """Return the timezone-aware ISO timestamp `days` ago, in UTC."""
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+def get_recent_orders(cutoff=None, url=GRAPHQL_URL):
+    """
+    Query GraphQL for orders placed within the last 7 days.
+    
+    Pages through the Relay `orders` connection and yields one list of
+    orders per page, so only a single page is held in memory at a time.
+    The cutoff is fixed once for the whole scan so the window cannot shift
+    between pages.
+    """
+    if cutoff is None:
+        cutoff = recent_orders_cutoff()
     
-    # Execute the query
-    client = setup_graphql_client()
-    result = client.execute(query, variable_values={
-        "orderDateGte": seven_days_ago_iso
-    })
+    cursor = None
     
-    return result['filteredOrders']
+    while True:
+        result = execute_query(ORDERS_QUERY, {
+            "orderDateGte": cutoff,
+            "first": PAGE_SIZE,
+            "after": cursor,
+        }, url)
+        connection = result['orders']
+        yield [edge['node'] for edge in connection['edges']]
+        
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        cursor = connection['pageInfo']['endCursor']
+
+async def execute_query_async(session, url, query, variables):
+    """Async counterpart of execute_query on an aiohttp session."""
+    async with session.post(url, json={"query": query, "variables": variables}) as response:
+        if response.content_type != 'application/json':
+            response.raise_for_status()
+        body = orjson.loads(await response.read())
+        if body.get('errors'):
+            raise Exception(body['errors'][0].get('message'))
+        response.raise_for_status()
+        return body['data']
 
-def log_order_reminder(order_id, customer_email, log_file):
-    """Log an order reminder with timestamp."""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"[{timestamp}] Order ID: {order_id}, Customer Email: {customer_email}\n"
+async def get_recent_orders_async(session, semaphore, url, cutoff):
+    """
+    Async counterpart of get_recent_orders for a single shard.
+    
+    Pages within a shard are fetched in order since each one needs the
+    previous cursor; the semaphore bounds requests across all shards.
+    """
+    cursor = None
     
-    with open(log_file, 'a') as f:
-        f.write(log_entry)
+    while True:
+        async with semaphore:
+            result = await execute_query_async(session, url, ORDERS_QUERY, {
+                "orderDateGte": cutoff,
+                "first": PAGE_SIZE,
+                "after": cursor,
+            })
+        connection = result['orders']
+        yield [edge['node'] for edge in connection['edges']]
+        
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        cursor = connection['pageInfo']['endCursor']
+
+async def process_shards_async(cutoff, handle_page):
+    """
+    Page through every shard concurrently, passing each page to handle_page.
+    
+    Returns the total number of orders across all shards.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    
+    async with aiohttp.ClientSession(timeout=timeout, headers=INTERNAL_HEADERS) as session:
+        async def process_shard(url):
+            shard_total = 0
+            async for orders in get_recent_orders_async(session, semaphore, url, cutoff):
+                shard_total += handle_page(orders)
+            return shard_total
+        
+        totals = await asyncio.gather(*(process_shard(url) for url in GRAPHQL_URLS))
+    return sum(totals)
+
+def process_shards(cutoff, handle_page):
+    """Sequential fallback for process_shards_async when aiohttp is missing."""
+    return sum(
+        handle_page(orders)
+        for url in GRAPHQL_URLS
+        for orders in get_recent_orders(cutoff, url)
+    )
+
+# Pulls (id, customer) out of an order node in one C-level call
+_order_fields = itemgetter('id', 'customer')
+
+def format_order_reminders(orders, prefix):
+    """Format one page of order reminder log lines into a single string."""
+    return "\n".join(
+        f"{prefix}Order ID: {order_id}, Customer Email: {customer['email']}"
+        for order_id, customer in map(_order_fields, orders)
+    )
 
 def main():
     """Main function to process order reminders."""
-    log_file = "/tmp/order_reminders_log.txt"
+    # Format the timestamp once per batch; every reminder line shares it
+    batch_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    prefix = f"[{batch_ts}] "
+    
+    logger.info(f"\n{prefix}Starting order reminders processing...")
+    
+    # Each page of lines goes out as a single log record
+    def write_page(orders):
+        if orders:
+            logger.info(format_order_reminders(orders, prefix))
+        return len(orders)
     
     try:
-        # Add starting log entry
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a') as f:
-            f.write(f"\n[{timestamp}] Starting order reminders processing...\n")
+        # One cutoff for every shard and page of this run
+        cutoff = recent_orders_cutoff()
         
-        # Get recent orders from GraphQL
-        orders = get_recent_orders()
-        
-        if not orders:
-            with open(log_file, 'a') as f:
-                f.write(f"[{timestamp}] No orders found in the last 7 days.\n")
+        # Get recent orders from every shard, one page at a time
+        if aiohttp is not None:
+            total_orders = asyncio.run(process_shards_async(cutoff, write_page))
         else:
-            # Log each order
-            for order in orders:
-                log_order_reminder(
-                    order['id'], 
-                    order['customer']['email'], 
-                    log_file
-                )
+            total_orders = process_shards(cutoff, write_page)
+        
+        if not total_orders:
+            logger.info(f"{prefix}No orders found in the last 7 days.")
         
         # Add completion log entry
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a') as f:
-            f.write(f"[{timestamp}] Order reminders processed! Total orders: {len(orders)}\n")
+        logger.info(f"[{timestamp}] Order reminders processed! Total orders: {total_orders}")
         
         # Print to console
         print("Order reminders processed!")
@@ -122,8 +257,7 @@ def main():
     except Exception as e:
         # Log any errors
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a') as f:
-            f.write(f"[{timestamp}] Error processing order reminders: {str(e)}\n")
+        logger.info(f"[{timestamp}] Error processing order reminders: {str(e)}")
         
         print(f"Error: {str(e)}")
         sys.exit(1)
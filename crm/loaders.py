@@ -0,0 +1,98 @@
+"""
+Per-request batch loaders for GraphQL resolvers.
+
+graphene-django's GraphQLView executes resolvers synchronously, so a
+promise-based DataLoader never gets a chance to collect keys before it has
+to answer. These loaders batch explicitly instead: a list resolver primes
+the loader with every key on the page (one IN query), and the field
+resolvers then read from the per-request cache.
+
+LoadersMiddleware attaches a fresh registry of loaders to every request
+context, so any resolver can reach them through `get_loader`.
+"""
+
+from .models import Customer, Product, Order
+
+
+class ModelLoader:
+    """
+    Cache model instances by primary key for the lifetime of one request.
+
+    Keys that are not cached yet are fetched together with a single
+    `in_bulk` query; keys that do not exist are cached as None.
+    """
+
+    model = None
+
+    def __init__(self):
+        self._cache = {}
+
+    def batch_load_fn(self, keys):
+        """Fetch all instances for the given keys in one query."""
+        return self.model.objects.in_bulk(keys)
+
+    def prime_many(self, keys):
+        """Load every key that is not cached yet with one query."""
+        missing = [key for key in set(keys) if key not in self._cache]
+        if missing:
+            found = self.batch_load_fn(missing)
+            for key in missing:
+                self._cache[key] = found.get(key)
+
+    def load(self, key):
+        """Return the instance for key, querying only on a cache miss."""
+        if key not in self._cache:
+            self.prime_many([key])
+        return self._cache[key]
+
+
+class CustomerLoader(ModelLoader):
+    model = Customer
+
+
+class ProductLoader(ModelLoader):
+    model = Product
+
+
+class OrderLoader(ModelLoader):
+    model = Order
+
+
+def build_loaders():
+    """Return a fresh set of loaders for one request, keyed by name."""
+    return {
+        'customer': CustomerLoader(),
+        'product': ProductLoader(),
+        'order': OrderLoader(),
+    }
+
+
+class LoadersMiddleware:
+    """Graphene middleware that gives each request context its own loaders."""
+
+    def resolve(self, next, root, info, **args):
+        context = info.context
+        if context is not None and not hasattr(context, 'loaders'):
+            context.loaders = build_loaders()
+        return next(root, info, **args)
+
+
+def get_loader(context, name):
+    """
+    Return the named loader from the request context.
+
+    Falls back to attaching a registry when the middleware is not installed
+    (e.g. `schema.execute()` in-process). Without a context at all a
+    throwaway loader is used.
+    """
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = build_loaders()
+        if context is not None:
+            context.loaders = loaders
+    return loaders[name]
+
+
+def get_customer_loader(context):
+    """Return the request's CustomerLoader."""
+    return get_loader(context, 'customer')
@@ -1,14 +1,57 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, connections, transaction
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from datetime import datetime, timedelta
+import io
+import os
 import random
 
+try:
+    # Vectorised random draws for large generated datasets
+    import numpy as np
+except ImportError:  # numpy is optional; fall back to the random module
+    np = None
+
+from crm._seed_data import CUSTOMERS, PRODUCTS
 from crm.models import Customer, Product, Order
 
+# Default rows per INSERT for the bulk_create calls below (--batch-size)
+BULK_BATCH_SIZE = int(os.environ.get('CRM_BULK_BATCH_SIZE', 500))
+
+
+def _random_ints(low, high, size):
+    """Draw size random ints in [low, high], in one numpy call when available."""
+    if np is not None:
+        return np.random.randint(low, high + 1, size=size, dtype=np.int64).tolist()
+    return [random.randint(low, high) for _ in range(size)]
+
+
+def _in_own_transaction(fn, *args):
+    """Run fn in a worker thread's own transaction, then close its connection."""
+    try:
+        with transaction.atomic():
+            return fn(*args)
+    finally:
+        connections.close_all()
+
+
+def _copy_text(value):
+    """Format one value for PostgreSQL COPY's text format."""
+    if value is None:
+        return r'\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
 
 class Command(BaseCommand):
     help = 'Seed the database with sample CRM data'
+    use_copy = False
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -34,24 +77,71 @@ class Command(BaseCommand):
             default=20,
             help='Number of orders to create (default: 20)',
         )
+        parser.add_argument(
+            '--use-copy',
+            action='store_true',
+            help='Load customers and products with COPY FROM STDIN (PostgreSQL only)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BULK_BATCH_SIZE,
+            help=f'Rows per bulk INSERT/UPDATE statement (default: {BULK_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Load customers and products concurrently on two connections (PostgreSQL only)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Starting database seeding...")
         
         # Check if migrations need to be applied
         from django.core.management import call_command
+        from django.db.migrations.executor import MigrationExecutor
         try:
-            call_command('migrate', verbosity=0)
-            self.stdout.write("✓ Migrations applied")
+            # Only run migrate when something is actually unapplied
+            executor = MigrationExecutor(connection)
+            if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+                call_command('migrate', verbosity=0)
+                self.stdout.write("✓ Migrations applied")
+            else:
+                self.stdout.write("✓ Migrations up to date")
         except Exception as e:
             self.stdout.write(self.style.WARNING(f"Migration warning: {str(e)}"))
         
         if options['clear']:
             self.clear_data()
         
-        customers = self.create_customers(options['customers'])
-        products = self.create_products(options['products'])
-        orders = self.create_orders(customers, products, options['orders'])
+        self.use_copy = options['use_copy'] and connection.vendor == 'postgresql'
+        if options['use_copy'] and not self.use_copy:
+            self.stdout.write(self.style.WARNING("--use-copy needs PostgreSQL; using bulk_create instead"))
+        
+        parallel = options['parallel'] and connection.vendor == 'postgresql'
+        if options['parallel'] and not parallel:
+            self.stdout.write(self.style.WARNING("--parallel needs PostgreSQL; seeding sequentially"))
+        
+        batch_size = options['batch_size']
+        if parallel:
+            # Customers and products share nothing, so they load side by side,
+            # each committed on its own connection before the orders go in
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                customers = executor.submit(
+                    _in_own_transaction, self.create_customers, options['customers'], batch_size
+                )
+                products = executor.submit(
+                    _in_own_transaction, self.create_products, options['products'], batch_size
+                )
+                customers, products = customers.result(), products.result()
+            with transaction.atomic():
+                orders = self.create_orders(customers, products, options['orders'], batch_size)
+        else:
+            # One transaction (and one commit) for the whole seed
+            with transaction.atomic():
+                customers = self.create_customers(options['customers'], batch_size)
+                products = self.create_products(options['products'], batch_size)
+                orders = self.create_orders(customers, products, options['orders'], batch_size)
         
         self.print_summary()
 
@@ -59,133 +149,148 @@ class Command(BaseCommand):
         """Clear existing data from the database."""
         self.stdout.write("Clearing existing data...")
         try:
-            Order.objects.all().delete()
-            Product.objects.all().delete()
-            Customer.objects.all().delete()
+            if connection.vendor == 'postgresql':
+                # One TRUNCATE instead of row-by-row cascading deletes
+                tables = [
+                    model._meta.db_table
+                    for model in (Order.products.through, Order, Product, Customer)
+                ]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"TRUNCATE TABLE {', '.join(map(connection.ops.quote_name, tables))} CASCADE"
+                    )
+            else:
+                Order.objects.all().delete()
+                Product.objects.all().delete()
+                Customer.objects.all().delete()
             self.stdout.write(self.style.SUCCESS("✓ Data cleared successfully!"))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f"Warning: Could not clear data - {str(e)}"))
             self.stdout.write("This might be because tables don't exist yet. Continuing...")
             pass
 
-    def create_customers(self, count):
+    def create_customers(self, count, batch_size=BULK_BATCH_SIZE):
         """Create sample customers."""
         self.stdout.write(f"Creating {count} customers...")
         
-        customers_data = [
-            {'name': 'Alice Johnson', 'email': 'alice.johnson@example.com', 'phone': '+1234567890'},
-            {'name': 'Bob Smith', 'email': 'bob.smith@example.com', 'phone': '123-456-7890'},
-            {'name': 'Carol Williams', 'email': 'carol.williams@example.com', 'phone': '+1987654321'},
-            {'name': 'David Brown', 'email': 'david.brown@example.com', 'phone': '987-654-3210'},
-            {'name': 'Eva Davis', 'email': 'eva.davis@example.com', 'phone': '+1122334455'},
-            {'name': 'Frank Miller', 'email': 'frank.miller@example.com', 'phone': '555-123-4567'},
-            {'name': 'Grace Wilson', 'email': 'grace.wilson@example.com', 'phone': '+1999888777'},
-            {'name': 'Henry Taylor', 'email': 'henry.taylor@example.com', 'phone': '444-555-6666'},
-            {'name': 'Ivy Anderson', 'email': 'ivy.anderson@example.com', 'phone': '+1777666555'},
-            {'name': 'Jack Thomas', 'email': 'jack.thomas@example.com', 'phone': '333-222-1111'},
-            {'name': 'Karen White', 'email': 'karen.white@example.com', 'phone': '+1555444333'},
-            {'name': 'Liam Garcia', 'email': 'liam.garcia@example.com', 'phone': '666-777-8888'},
-            {'name': 'Mia Rodriguez', 'email': 'mia.rodriguez@example.com', 'phone': '+1888999000'},
-            {'name': 'Noah Martinez', 'email': 'noah.martinez@example.com', 'phone': '111-222-3333'},
-            {'name': 'Olivia Hernandez', 'email': 'olivia.hernandez@example.com', 'phone': '+1444555666'},
-        ]
-        
-        customers = []
-        for i in range(min(count, len(customers_data))):
-            customer = Customer.objects.create(**customers_data[i])
-            customers.append(customer)
+        customers = [Customer(**data) for data in CUSTOMERS[:count]]
         
         # If we need more customers than predefined, generate them
-        for i in range(len(customers_data), count):
-            customer_data = {
-                'name': f'Customer {i+1}',
-                'email': f'customer{i+1}@example.com',
-                'phone': f'+1{random.randint(1000000000, 9999999999)}'
-            }
-            customer = Customer.objects.create(**customer_data)
-            customers.append(customer)
+        extra = range(len(CUSTOMERS), count)
+        phones = _random_ints(1000000000, 9999999999, len(extra))
+        for i, phone in zip(extra, phones):
+            customers.append(Customer(
+                name=f'Customer {i+1}',
+                email=f'customer{i+1}@example.com',
+                phone=f'+1{phone}',
+            ))
+        
+        for customer in customers:
+            customer.sync_phone_sanitized()
+        if self.use_copy:
+            self.copy_rows(Customer, customers)
+        else:
+            customers = Customer.objects.bulk_create(customers, batch_size=batch_size)
         
         self.stdout.write(self.style.SUCCESS(f"✓ Created {len(customers)} customers successfully!"))
         return customers
 
-    def create_products(self, count):
+    def create_products(self, count, batch_size=BULK_BATCH_SIZE):
         """Create sample products."""
         self.stdout.write(f"Creating {count} products...")
         
-        products_data = [
-            {'name': 'MacBook Pro 16"', 'price': Decimal('2499.99'), 'stock': 15},
-            {'name': 'Dell XPS 13', 'price': Decimal('1299.99'), 'stock': 25},
-            {'name': 'iPhone 15 Pro', 'price': Decimal('999.99'), 'stock': 50},
-            {'name': 'Samsung Galaxy S24', 'price': Decimal('899.99'), 'stock': 40},
-            {'name': 'iPad Air', 'price': Decimal('599.99'), 'stock': 30},
-            {'name': 'AirPods Pro', 'price': Decimal('249.99'), 'stock': 100},
-            {'name': 'Sony WH-1000XM5', 'price': Decimal('399.99'), 'stock': 20},
-            {'name': 'Microsoft Surface Pro', 'price': Decimal('1199.99'), 'stock': 18},
-            {'name': 'Apple Watch Series 9', 'price': Decimal('429.99'), 'stock': 35},
-            {'name': 'Nintendo Switch OLED', 'price': Decimal('349.99'), 'stock': 45},
-            {'name': 'LG 27" 4K Monitor', 'price': Decimal('449.99'), 'stock': 12},
-            {'name': 'Logitech MX Master 3', 'price': Decimal('99.99'), 'stock': 60},
-            {'name': 'Mechanical Keyboard', 'price': Decimal('159.99'), 'stock': 25},
-            {'name': 'Webcam HD 1080p', 'price': Decimal('79.99'), 'stock': 40},
-            {'name': 'Bluetooth Speaker', 'price': Decimal('129.99'), 'stock': 55},
-            {'name': 'Gaming Mouse', 'price': Decimal('89.99'), 'stock': 70},
-            {'name': 'USB-C Hub', 'price': Decimal('49.99'), 'stock': 80},
-            {'name': 'Wireless Charger', 'price': Decimal('39.99'), 'stock': 90},
-            {'name': 'External SSD 1TB', 'price': Decimal('149.99'), 'stock': 35},
-            {'name': 'Phone Case', 'price': Decimal('24.99'), 'stock': 200},
-        ]
-        
-        products = []
-        for i in range(min(count, len(products_data))):
-            product = Product.objects.create(**products_data[i])
-            products.append(product)
+        products = [Product(**data) for data in PRODUCTS[:count]]
         
         # If we need more products than predefined, generate them
-        for i in range(len(products_data), count):
-            product_data = {
-                'name': f'Product {i+1}',
-                'price': Decimal(f'{random.uniform(10, 1000):.2f}'),
-                'stock': random.randint(5, 100)
-            }
-            product = Product.objects.create(**product_data)
-            products.append(product)
+        extra = range(len(PRODUCTS), count)
+        # 10.00-1000.00, built from whole cents rather than a formatted float
+        cents = _random_ints(1000, 100000, len(extra))
+        stocks = _random_ints(5, 100, len(extra))
+        for i, price_cents, stock in zip(extra, cents, stocks):
+            products.append(Product(
+                name=f'Product {i+1}',
+                price=Decimal(price_cents).scaleb(-2),
+                stock=stock,
+            ))
+        
+        if self.use_copy:
+            self.copy_rows(Product, products)
+        else:
+            products = Product.objects.bulk_create(products, batch_size=batch_size)
         
         self.stdout.write(self.style.SUCCESS(f"✓ Created {len(products)} products successfully!"))
         return products
 
-    def create_orders(self, customers, products, count):
+    def copy_rows(self, model, objs):
+        """Insert unsaved instances with PostgreSQL COPY FROM STDIN instead of INSERTs."""
+        fields = model._meta.concrete_fields
+        buf = io.StringIO()
+        for obj in objs:
+            # pre_save fills in the auto_now/auto_now_add timestamps, as an INSERT would
+            values = [field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields]
+            buf.write('\t'.join(map(_copy_text, values)) + '\n')
+            obj._state.adding = False
+            obj._state.db = connection.alias
+        
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f"COPY {table} ({columns}) FROM STDIN"
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                buf.seek(0)
+                cursor.cursor.copy_expert(sql, buf)
+            else:  # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    copy.write(buf.getvalue())
+
+    def create_orders(self, customers, products, count, batch_size=BULK_BATCH_SIZE):
         """Create sample orders."""
         self.stdout.write(f"Creating {count} orders...")
         
         orders = []
+        order_products = []
+        order_dates = []
+        # Looked up by index in the loop below
+        prices = [product.price for product in products]
+        # Order dates are counted back from a single now()
+        now = datetime.now()
         
-        with transaction.atomic():
-            for i in range(count):
-                # Select random customer
-                customer = random.choice(customers)
-                
-                # Select 1-4 random products for each order
-                num_products = random.randint(1, min(4, len(products)))
-                selected_products = random.sample(products, num_products)
-                
-                # Create order
-                order = Order.objects.create(customer=customer)
-                order.products.set(selected_products)
-                
-                # Calculate total amount
-                total = sum(product.price for product in selected_products)
-                order.total_amount = total
-                order.save(update_fields=['total_amount'])
-                
-                # Update order date to a random date in the last 30 days
-                days_ago = random.randint(0, 30)
-                order_date = datetime.now() - timedelta(days=days_ago)
-                Order.objects.filter(id=order.id).update(
-                    order_date=order_date,
-                    created_at=order_date
-                )
-                
-                orders.append(order)
+        # A random customer and 1-4 random products for each order, drawn up front
+        order_customers = random.choices(customers, k=count)
+        order_sizes = _random_ints(1, min(4, len(products)), count)
+        
+        for customer, num_products in zip(order_customers, order_sizes):
+            selected_idxs = random.sample(range(len(products)), num_products)
+            selected_products = [products[j] for j in selected_idxs]
+            
+            orders.append(Order(
+                customer=customer,
+                total_amount=sum(prices[j] for j in selected_idxs),
+                product_count=num_products,
+            ))
+            order_products.append(selected_products)
+            
+            # Random order date in the last 30 days
+            days_ago = random.randint(0, 30)
+            order_dates.append(now - timedelta(days=days_ago))
+        
+        OrderProduct = Order.products.through
+        # Two INSERT statements for all the orders and their product links
+        orders = Order.objects.bulk_create(orders, batch_size=batch_size)
+        OrderProduct.objects.bulk_create(
+            [
+                OrderProduct(order_id=order.pk, product_id=product.pk)
+                for order, selected_products in zip(orders, order_products)
+                for product in selected_products
+            ],
+            batch_size=batch_size,
+        )
+        
+        # order_date/created_at are auto_now_add, so bulk_create stamped them
+        # with now(); bulk_update writes the random dates in one CASE/WHEN UPDATE
+        for order, order_date in zip(orders, order_dates):
+            order.order_date = order.created_at = order_date
+        Order.objects.bulk_update(orders, ['order_date', 'created_at'], batch_size=batch_size)
         
         self.stdout.write(self.style.SUCCESS(f"✓ Created {len(orders)} orders successfully!"))
         return orders
@@ -196,9 +301,11 @@ class Command(BaseCommand):
         self.stdout.write("DATABASE SEEDING COMPLETED!")
         self.stdout.write("="*60)
         
-        customer_count = Customer.objects.count()
-        product_count = Product.objects.count()
-        order_count = Order.objects.count()
+        # All three totals in one round trip, including rows from earlier runs
+        tables = [connection.ops.quote_name(model._meta.db_table) for model in (Customer, Product, Order)]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table})" for table in tables))
+            customer_count, product_count, order_count = cursor.fetchone()
         
         self.stdout.write(f"Total Customers: {customer_count}")
         self.stdout.write(f"Total Products: {product_count}")
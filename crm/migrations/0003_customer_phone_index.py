@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-15 05:51
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, max_length=17, null=True, validators=[django.core.validators.RegexValidator(message="Phone number must be entered in the format: '+999999999' or '999-999-9999'. Up to 15 digits allowed.", regex='^\\+?1?\\d{9,15}$|^\\d{3}-\\d{3}-\\d{4}$')]),
+        ),
+    ]
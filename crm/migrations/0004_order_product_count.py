@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-15 05:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_product_count(apps, schema_editor):
+    Order = apps.get_model('crm', 'Order')
+    OrderProduct = Order.products.through
+    counts = (
+        OrderProduct.objects
+        .filter(order_id=OuterRef('pk'))
+        .values('order_id')
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    Order.objects.update(
+        product_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_customer_phone_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='product_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_product_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-15 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0005_order_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(condition=models.Q(('phone__isnull', False), models.Q(('phone', ''), _negated=True)), fields=['id'], name='customer_has_phone'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('stock', 0)), fields=['id'], name='product_out_of_stock'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['id'], name='product_in_stock'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-15 05:54
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_phone_sanitized(apps, schema_editor):
+    Customer = apps.get_model('crm', 'Customer')
+    customers = list(Customer.objects.exclude(phone__isnull=True).exclude(phone='').only('id', 'phone'))
+    for customer in customers:
+        customer.phone_sanitized = re.sub(r'\D', '', customer.phone)
+    Customer.objects.bulk_update(customers, ['phone_sanitized'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0006_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_sanitized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_phone_sanitized, migrations.RunPython.noop),
+    ]
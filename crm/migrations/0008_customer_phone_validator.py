@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-15 06:03
+
+import crm.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0007_customer_phone_sanitized'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, max_length=17, null=True, validators=[crm.models.validate_phone]),
+        ),
+    ]
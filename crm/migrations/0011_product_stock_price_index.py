@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-15 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0010_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock', 'price', 'name'], name='product_stock_price'),
+        ),
+    ]
@@ -1,32 +1,78 @@
 from django.db import models
-from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
 from decimal import Decimal
+import re
 import uuid
 
+try:
+    # Rust-backed uuid4 returning standard uuid.UUID objects
+    from uuid_utils.compat import uuid4 as _uuid4
+except ImportError:  # uuid_utils is optional; fall back to the stdlib
+    _uuid4 = uuid.uuid4
+
+# Everything that is not a digit, stripped to build Customer.phone_sanitized
+NON_DIGITS_RE = re.compile(r'\D')
+
+# Accepted phone formats: +999999999 (up to 15 digits) or 999-999-9999
+PHONE_RE = re.compile(r'^\+?1?\d{9,15}$|^\d{3}-\d{3}-\d{4}$')
+
+
+def validate_phone(value):
+    """Phone validator matching PHONE_RE directly, without RegexValidator's lazy wrapper."""
+    if not PHONE_RE.search(str(value)):
+        raise ValidationError(
+            "Phone number must be entered in the format: '+999999999' or '999-999-9999'. Up to 15 digits allowed.",
+            code='invalid',
+        )
+
+
+def generate_uuid():
+    """Primary key default for the CRM models; a plain uuid4 either way."""
+    return _uuid4()
+
 
 class Customer(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
     # models.CharField(max_length=100)
-    name = models.CharField(max_length=255)
+    # Indexed for Meta.ordering, so paginated lists can read it in order
+    name = models.CharField(max_length=255, db_index=True)
     email = models.EmailField(unique=True)
-    phone_regex = RegexValidator(
-        regex=r'^\+?1?\d{9,15}$|^\d{3}-\d{3}-\d{4}$',
-        message="Phone number must be entered in the format: '+999999999' or '999-999-9999'. Up to 15 digits allowed."
-    )
-    phone = models.CharField(validators=[phone_regex], max_length=17, blank=True, null=True)
+    phone = models.CharField(validators=[validate_phone], max_length=17, blank=True, null=True, db_index=True)
+    # Digits-only copy of phone for indexed prefix searches, filled in on save
+    phone_sanitized = models.CharField(max_length=20, blank=True, default='', editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def sync_phone_sanitized(self):
+        """Refresh phone_sanitized from phone; bulk inserts must call this themselves."""
+        self.phone_sanitized = NON_DIGITS_RE.sub('', self.phone or '')
+
+    def save(self, *args, **kwargs):
+        self.sync_phone_sanitized()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_sanitized'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} ({self.email})"
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Partial index matching AdvancedCustomerFilter.has_phone
+            models.Index(
+                fields=['id'],
+                name='customer_has_phone',
+                condition=models.Q(phone__isnull=False) & ~models.Q(phone=''),
+            ),
+        ]
 
 
 class Product(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    name = models.CharField(max_length=255)
+    id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
+    # Indexed for Meta.ordering, so paginated lists can read it in order
+    name = models.CharField(max_length=255, db_index=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -37,33 +83,44 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Partial indexes matching ProductFilter.out_of_stock / in_stock
+            models.Index(fields=['id'], name='product_out_of_stock', condition=models.Q(stock=0)),
+            models.Index(fields=['id'], name='product_in_stock', condition=models.Q(stock__gt=0)),
+            # Stock thresholds combined with price ranges (low_stock +
+            # price_category); name rides along as a trailing key column, so
+            # listing the matches needs no table reads on either backend
+            models.Index(fields=['stock', 'price', 'name'], name='product_stock_price'),
+        ]
 
 
 class Order(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=generate_uuid, editable=False)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     products = models.ManyToManyField(Product, related_name='orders')
+    # Sum of the products' prices, kept in sync by crm.signals; bulk inserts
+    # of the through rows send no m2m_changed and must set both fields themselves
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
-    order_date = models.DateTimeField(auto_now_add=True)
+    # Denormalized products.count(), kept in sync by crm.signals
+    product_count = models.PositiveIntegerField(default=0, db_index=True)
+    order_date = models.DateTimeField(auto_now_add=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def calculate_total_amount(self):
         """Calculate total amount based on associated products"""
-        total = sum(product.price for product in self.products.all())
+        # Summed in the database: one scalar instead of every product row
+        total = self.products.aggregate(total=models.Sum('price'))['total'] or Decimal('0')
+        # SQLite hands sums back with spurious digits; keep it to cents
+        total = total.quantize(Decimal('0.01'))
         self.total_amount = total
         return total
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.pk:  # Only calculate if order exists (for M2M relationship)
-            self.calculate_total_amount()
-            super().save(update_fields=['total_amount'])
-
     def __str__(self):
         return f"Order #{self.id} - {self.customer.name} - ${self.total_amount}"
 
     class Meta:
+        # Served by the order_date index, scanned backwards; no sort step needed
         ordering = ['-order_date']
 
 
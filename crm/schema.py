@@ -1,11 +1,15 @@
 import graphene
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
 from graphene_django.types import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from decimal import Decimal
 from .models import Customer, Product, Order
-from .filters import CustomerFilter, AdvancedCustomerFilter, ProductFilter, AdvancedProductFilter, OrderFilter, AdvancedOrderFilter
+from .loaders import get_customer_loader
+from .filters import CustomerFilter, AdvancedCustomerFilter, ProductFilter, AdvancedProductFilter, OrderFilter, AdvancedOrderFilter, parse_uuid_or_none
 
 
 # CRM Statistics Type
@@ -34,6 +38,71 @@ class ProductType(DjangoObjectType):
         interfaces = (graphene.relay.Node, )
 
 
+def _selected_fields(selection_set, fragments):
+    """Yield the field nodes of a selection set, expanding fragments."""
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, FragmentSpreadNode):
+            yield from _selected_fields(fragments[selection.name.value].selection_set, fragments)
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _selected_fields(selection.selection_set, fragments)
+
+
+def is_selected(info, *path):
+    """
+    Whether the query selects the given path of fields below the field
+    being resolved, e.g. is_selected(info, 'orders', 'edges', 'node', 'products').
+    """
+    selection_sets = [node.selection_set for node in info.field_nodes if node.selection_set]
+    for name in path:
+        matches = [
+            field
+            for selection_set in selection_sets
+            for field in _selected_fields(selection_set, info.fragments)
+            if field.name.value == name
+        ]
+        if not matches:
+            return False
+        selection_sets = [field.selection_set for field in matches if field.selection_set]
+    return True
+
+
+def selected_columns(info, model):
+    """
+    Names of the model's columns the query selects directly below the field
+    being resolved, plus the primary key; for narrowing a queryset with only().
+    """
+    names = {
+        to_snake_case(field.name.value)
+        for node in info.field_nodes if node.selection_set
+        for field in _selected_fields(node.selection_set, info.fragments)
+    }
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if field.primary_key or field.name in names
+    ]
+
+
+def prime_order_customers(info, orders):
+    """Load the customers of every order in the page with a single query."""
+    # Orders that came through select_related already carry their customer
+    get_customer_loader(info.context).prime_many(
+        order.customer_id for order in orders if not Order.customer.is_cached(order)
+    )
+
+
+class OrderConnection(graphene.relay.Connection):
+    class Meta:
+        abstract = True
+
+    def resolve_edges(self, info):
+        if is_selected(info, 'node', 'customer'):
+            prime_order_customers(info, [edge.node for edge in self.edges])
+        return self.edges
+
+
 class OrderType(DjangoObjectType):
     class Meta:
         model = Order
@@ -41,6 +110,13 @@ class OrderType(DjangoObjectType):
         # Enable filtering for this type
         filterset_class = OrderFilter
         interfaces = (graphene.relay.Node, )
+        connection_class = OrderConnection
+
+    def resolve_customer(self, info):
+        # Reuse a customer already fetched through select_related
+        if Order.customer.is_cached(self):
+            return self.customer
+        return get_customer_loader(info.context).load(self.customer_id)
 
 
 # Input Types
@@ -52,8 +128,10 @@ class CustomerInput(graphene.InputObjectType):
 
 class ProductInput(graphene.InputObjectType):
     name = graphene.String(required=True)
-    price = graphene.Float(required=True)  # Changed back to Float for easier input
-    stock = graphene.Int()
+    # The constraints are checked in CreateProductMutation, which reports
+    # them through its errors list
+    price = graphene.Float(required=True, description="Must be positive")  # Changed back to Float for easier input
+    stock = graphene.Int(description="0 or greater; defaults to 0")
 
 
 class OrderInput(graphene.InputObjectType):
@@ -80,21 +158,24 @@ class CreateCustomerMutation(graphene.Mutation):
 
     def mutate(self, info, input):
         try:
-            # Check if email already exists
-            if Customer.objects.filter(email=input.email).exists():
-                return CreateCustomerMutation(
-                    errors=[ErrorType(field="email", message="Email already exists")]
-                )
-            
             # Validate phone format if provided
             if input.phone:
                 customer = Customer(name=input.name, email=input.email, phone=input.phone)
-                customer.full_clean()  # This will validate the phone regex
             else:
                 customer = Customer(name=input.name, email=input.email)
-                customer.full_clean()
+            # Email uniqueness is left to the unique index below, which saves
+            # the SELECTs of an exists() pre-check and of validate_unique
+            clean_customer_input(customer)  # This will validate the phone regex
             
-            customer.save()
+            try:
+                with transaction.atomic():
+                    customer.save()
+            except IntegrityError as e:
+                if 'email' not in str(e):
+                    raise
+                return CreateCustomerMutation(
+                    errors=[ErrorType(field="email", message="Email already exists")]
+                )
             return CreateCustomerMutation(
                 customer=customer,
                 message=f"Customer '{customer.name}' created successfully!"
@@ -117,6 +198,31 @@ class CreateCustomerMutation(graphene.Mutation):
             )
 
 
+# The only Customer fields a bulk create sets from input
+CUSTOMER_INPUT_FIELDS = [Customer._meta.get_field(name) for name in ('name', 'email', 'phone')]
+
+
+def clean_customer_input(customer):
+    """
+    Validate only the fields taken from input, the way Model.clean_fields()
+    does for each of them, raising ValidationError with a per-field dict.
+    
+    Cheaper than full_clean() on the bulk path: the remaining fields are
+    generated, and email uniqueness is checked for the whole batch at once.
+    """
+    errors = {}
+    for field in CUSTOMER_INPUT_FIELDS:
+        raw_value = getattr(customer, field.attname)
+        if field.blank and raw_value in field.empty_values:
+            continue
+        try:
+            setattr(customer, field.attname, field.clean(raw_value, customer))
+        except ValidationError as e:
+            errors[field.name] = e.error_list
+    if errors:
+        raise ValidationError(errors)
+
+
 class BulkCreateCustomersMutation(graphene.Mutation):
     class Arguments:
         input = graphene.List(CustomerInput, required=True)
@@ -128,11 +234,17 @@ class BulkCreateCustomersMutation(graphene.Mutation):
         customers_created = []
         errors = []
         
-        # Process each customer individually (not in a single transaction for partial success)
+        # One query for all the emails that are already taken
+        emails = [customer_input.email for customer_input in input]
+        taken_emails = set(Customer.objects.filter(email__in=emails).values_list('email', flat=True))
+        
+        # Validate each customer individually (partial success: invalid rows are
+        # reported, the valid ones are still created)
+        new_customers = []
         for i, customer_input in enumerate(input):
             try:
-                # Check if email already exists
-                if Customer.objects.filter(email=customer_input.email).exists():
+                # Check if email already exists, in the database or earlier in this batch
+                if customer_input.email in taken_emails:
                     errors.append(ErrorType(
                         field=f"customer_{i}_email",
                         message="Email already exists"
@@ -151,9 +263,11 @@ class BulkCreateCustomersMutation(graphene.Mutation):
                         email=customer_input.email
                     )
                 
-                customer.full_clean()
-                customer.save()
-                customers_created.append(customer)
+                # Uniqueness was checked above for the whole batch
+                clean_customer_input(customer)
+                customer.sync_phone_sanitized()
+                taken_emails.add(customer.email)
+                new_customers.append((i, customer))
                 
             except ValidationError as e:
                 for field, messages in e.message_dict.items():
@@ -176,6 +290,31 @@ class BulkCreateCustomersMutation(graphene.Mutation):
                     message=str(e)
                 ))
         
+        if new_customers:
+            try:
+                with transaction.atomic():
+                    Customer.objects.bulk_create(
+                        [customer for _, customer in new_customers],
+                        batch_size=1000,
+                        ignore_conflicts=True,
+                    )
+                    # Rows skipped as conflicts (an email taken concurrently)
+                    # are missing here; the primary keys are generated client-side
+                    inserted = set(Customer.objects.filter(
+                        pk__in=[customer.pk for _, customer in new_customers]
+                    ).values_list('pk', flat=True))
+            except Exception as e:
+                errors.append(ErrorType(field="general", message=str(e)))
+            else:
+                for i, customer in new_customers:
+                    if customer.pk in inserted:
+                        customers_created.append(customer)
+                    else:
+                        errors.append(ErrorType(
+                            field=f"customer_{i}_email",
+                            message="Email already exists"
+                        ))
+        
         return BulkCreateCustomersMutation(customers=customers_created, errors=errors)
 
 
@@ -188,13 +327,11 @@ class CreateProductMutation(graphene.Mutation):
 
     def mutate(self, info, input):
         try:
-            # Convert price float to Decimal and validate it's positive
-            try:
-                price = Decimal(str(input.price))
-            except (ValueError, TypeError):
-                return CreateProductMutation(
-                    errors=[ErrorType(field="price", message="Invalid price format")]
-                )
+            # Convert price float to Decimal and validate it's positive.
+            # GraphQL has already rejected anything that is not a finite Float,
+            # and str() gives its shortest repr, so 0.1 becomes Decimal('0.1')
+            # rather than the binary float's 55-digit expansion
+            price = Decimal(str(input.price))
             
             if price <= 0:
                 return CreateProductMutation(
@@ -288,10 +425,14 @@ class CreateOrderMutation(graphene.Mutation):
 
     def mutate(self, info, input):
         try:
-            # Validate customer exists
-            try:
-                customer = Customer.objects.get(id=input.customerId)
-            except Customer.DoesNotExist:
+            # Validate customer exists. The request's customer loader is used,
+            # so several createOrder calls in one request share the lookups and
+            # the order's customer field resolves without another query
+            customer_uuid = parse_uuid_or_none(str(input.customerId))
+            customer = None
+            if customer_uuid is not None:
+                customer = get_customer_loader(info.context).load(customer_uuid)
+            if customer is None:
                 return CreateOrderMutation(
                     errors=[ErrorType(field="customerId", message="Customer does not exist")]
                 )
@@ -302,15 +443,26 @@ class CreateOrderMutation(graphene.Mutation):
                     errors=[ErrorType(field="productIds", message="At least one product must be selected")]
                 )
             
+            # Parse every ID once (None when malformed), then fetch all
+            # products with one IN query
+            product_uuids = {
+                product_id: parse_uuid_or_none(str(product_id))
+                for product_id in input.productIds
+            }
+            products_by_id = Product.objects.only('id', 'price').in_bulk(
+                [product_uuid for product_uuid in product_uuids.values() if product_uuid is not None]
+            )
+            
+            # Invalid IDs are kept as the strings the client sent, so the error
+            # message below is only built when needed and formats no UUIDs
             products = []
             invalid_product_ids = []
-            
             for product_id in input.productIds:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    products.append(product)
-                except Product.DoesNotExist:
+                product = products_by_id.get(product_uuids.get(product_id))
+                if product is None:
                     invalid_product_ids.append(product_id)
+                else:
+                    products.append(product)
             
             if invalid_product_ids:
                 return CreateOrderMutation(
@@ -320,19 +472,26 @@ class CreateOrderMutation(graphene.Mutation):
                     )]
                 )
             
-            # Create order
+            # Linked once each, as products.set() would
+            products = list({product.pk: product for product in products}.values())
+            
+            # Create order with its totals known up front, then link the
+            # products with one INSERT
+            OrderProduct = Order.products.through
             with transaction.atomic():
-                order = Order(customer=customer)
+                order = Order(
+                    customer=customer,
+                    total_amount=sum((product.price for product in products), Decimal('0.00')),
+                    product_count=len(products),
+                )
                 if input.order_date:
                     order.order_date = input.order_date
                 
                 order.save()
-                order.products.set(products)
-                
-                # Calculate total amount
-                total = sum(product.price for product in products)
-                order.total_amount = total
-                order.save(update_fields=['total_amount'])
+                OrderProduct.objects.bulk_create([
+                    OrderProduct(order_id=order.pk, product_id=product.pk)
+                    for product in products
+                ])
             
             return CreateOrderMutation(order=order)
             
@@ -342,10 +501,100 @@ class CreateOrderMutation(graphene.Mutation):
             )
 
 
+class BulkCreateOrdersMutation(graphene.Mutation):
+    class Arguments:
+        input = graphene.List(OrderInput, required=True)
+
+    orders = graphene.List(OrderType)
+    errors = graphene.List(ErrorType)
+
+    def mutate(self, info, input):
+        errors = []
+        
+        # Parse every ID once, then load all customers and all products with
+        # one IN query each
+        parsed = [
+            (
+                parse_uuid_or_none(str(order_input.customerId)),
+                [parse_uuid_or_none(str(product_id)) for product_id in order_input.productIds or []],
+            )
+            for order_input in input
+        ]
+        customer_loader = get_customer_loader(info.context)
+        customer_loader.prime_many(
+            customer_uuid for customer_uuid, _ in parsed if customer_uuid is not None
+        )
+        products_by_id = Product.objects.only('id', 'price').in_bulk(
+            {product_uuid for _, product_uuids in parsed for product_uuid in product_uuids if product_uuid is not None}
+        )
+        
+        # Validate each order individually (partial success: invalid orders
+        # are reported, the valid ones are still created)
+        new_orders = []
+        for i, (order_input, (customer_uuid, product_uuids)) in enumerate(zip(input, parsed)):
+            customer = customer_loader.load(customer_uuid) if customer_uuid is not None else None
+            if customer is None:
+                errors.append(ErrorType(field=f"order_{i}_customerId", message="Customer does not exist"))
+                continue
+            
+            if not order_input.productIds:
+                errors.append(ErrorType(
+                    field=f"order_{i}_productIds",
+                    message="At least one product must be selected"
+                ))
+                continue
+            
+            invalid_product_ids = [
+                product_id
+                for product_id, product_uuid in zip(order_input.productIds, product_uuids)
+                if product_uuid not in products_by_id
+            ]
+            if invalid_product_ids:
+                errors.append(ErrorType(
+                    field=f"order_{i}_productIds",
+                    message=f"Invalid product IDs: {', '.join(invalid_product_ids)}"
+                ))
+                continue
+            
+            # Linked once each, as products.set() would
+            products = list({product_uuid: products_by_id[product_uuid] for product_uuid in product_uuids}.values())
+            order = Order(
+                customer=customer,
+                total_amount=sum((product.price for product in products), Decimal('0.00')),
+                product_count=len(products),
+            )
+            if order_input.order_date:
+                order.order_date = order_input.order_date
+            new_orders.append((order, products))
+        
+        if not new_orders:
+            return BulkCreateOrdersMutation(orders=[], errors=errors)
+        
+        try:
+            # Two INSERT statements for the whole batch: orders, then links
+            OrderProduct = Order.products.through
+            with transaction.atomic():
+                Order.objects.bulk_create([order for order, _ in new_orders], batch_size=1000)
+                OrderProduct.objects.bulk_create(
+                    [
+                        OrderProduct(order_id=order.pk, product_id=product.pk)
+                        for order, products in new_orders
+                        for product in products
+                    ],
+                    batch_size=5000,
+                )
+        except Exception as e:
+            errors.append(ErrorType(field="general", message=str(e)))
+            return BulkCreateOrdersMutation(orders=[], errors=errors)
+        
+        return BulkCreateOrdersMutation(orders=[order for order, _ in new_orders], errors=errors)
+
+
 # Query class
 class Query(graphene.ObjectType):
     # Health check field
-    hello = graphene.String(default_value="Hello from CRM!")
+    # Constant answer: no resolver, so graphene returns the default directly
+    hello = graphene.String(default_value="Hello from CRM GraphQL! System is operational.")
     
     # CRM Statistics
     crm_stats = graphene.Field(CRMStatsType)
@@ -442,14 +691,8 @@ class Query(graphene.ObjectType):
         offset=graphene.Int(description="Offset for pagination")
     )
 
-    def resolve_hello(self, info):
-        """Health check resolver that confirms CRM GraphQL is working"""
-        return "Hello from CRM GraphQL! System is operational."
-
     def resolve_crm_stats(self, info):
         """Resolver for CRM statistics"""
-        from django.db.models import Sum
-        
         total_customers = Customer.objects.count()
         total_orders = Order.objects.count()
         total_revenue = Order.objects.aggregate(total=Sum('total_amount'))['total'] or 0.0
@@ -460,32 +703,72 @@ class Query(graphene.ObjectType):
             total_revenue=float(total_revenue)
         )
 
+    # The list and single-object resolvers load only the columns the query
+    # selects, and join or prefetch the relations it selects, so nested
+    # fields are not loaded once per row
+    @staticmethod
+    def _customers_queryset(info):
+        queryset = Customer.objects.only(*selected_columns(info, Customer))
+        if is_selected(info, 'orders', 'edges', 'node', 'products'):
+            queryset = queryset.prefetch_related('orders__products')
+        elif is_selected(info, 'orders'):
+            queryset = queryset.prefetch_related('orders')
+        return queryset
+
+    @staticmethod
+    def _products_queryset(info):
+        queryset = Product.objects.only(*selected_columns(info, Product))
+        if is_selected(info, 'orders'):
+            queryset = queryset.prefetch_related('orders')
+        return queryset
+
+    @staticmethod
+    def _with_order_relations(info, queryset, *path):
+        """
+        Join the customer and prefetch the products of the orders when the
+        query selects them; path leads to the order objects (e.g. 'edges',
+        'node' for a connection).
+        """
+        if is_selected(info, *path, 'customer'):
+            queryset = queryset.select_related('customer')
+        if is_selected(info, *path, 'products'):
+            queryset = queryset.prefetch_related('products')
+        return queryset
+
+    @staticmethod
+    def _orders_queryset(info):
+        queryset = Order.objects.only(*selected_columns(info, Order))
+        return Query._with_order_relations(info, queryset)
+
     def resolve_all_customers(self, info):
-        return Customer.objects.all()
+        return Query._customers_queryset(info)
 
     def resolve_all_products(self, info):
-        return Product.objects.all()
+        return Query._products_queryset(info)
 
     def resolve_all_orders(self, info):
-        return Order.objects.all()
+        return Query._orders_queryset(info)
 
-    def resolve_customer(self, info, id):
-        try:
-            return Customer.objects.get(pk=id)
-        except Customer.DoesNotExist:
+    def resolve_orders(self, info, **kwargs):
+        # OrderFilter is applied to this queryset by the connection field
+        return Query._with_order_relations(info, Order.objects.all(), 'edges', 'node')
+
+    @staticmethod
+    def _get_by_id(queryset, id):
+        """The row with the given UUID, or None if it is missing or malformed."""
+        pk = parse_uuid_or_none(id)
+        if pk is None:
             return None
+        return queryset.filter(pk=pk).first()
+
+    def resolve_customer(self, info, id):
+        return Query._get_by_id(Query._customers_queryset(info), id)
 
     def resolve_product(self, info, id):
-        try:
-            return Product.objects.get(pk=id)
-        except Product.DoesNotExist:
-            return None
+        return Query._get_by_id(Query._products_queryset(info), id)
 
     def resolve_order(self, info, id):
-        try:
-            return Order.objects.get(pk=id)
-        except Order.DoesNotExist:
-            return None
+        return Query._get_by_id(Query._orders_queryset(info), id)
     
     # NEW: Resolver for filtered_customers
     def resolve_filtered_customers(self, info, **kwargs):
@@ -579,7 +862,7 @@ class Query(graphene.ObjectType):
         This demonstrates how to apply OrderFilter to the Order queryset,
         including complex related field filtering.
         """
-        queryset = Order.objects.all()
+        queryset = Query._with_order_relations(info, Order.objects.all())
         
         # Apply the OrderFilter
         filter_instance = OrderFilter(kwargs, queryset=queryset)
@@ -594,8 +877,12 @@ class Query(graphene.ObjectType):
         
         if limit:
             filtered_queryset = filtered_queryset[:limit]
-            
-        return filtered_queryset
+        
+        # Batch the customer lookups for the whole page into one query
+        orders = list(filtered_queryset)
+        if is_selected(info, 'customer'):
+            prime_order_customers(info, orders)
+        return orders
 
 
 # Mutation class
@@ -605,6 +892,5 @@ class Mutation(graphene.ObjectType):
     bulk_create_customers = BulkCreateCustomersMutation.Field()
     create_product = CreateProductMutation.Field()
     create_order = CreateOrderMutation.Field()
+    bulk_create_orders = BulkCreateOrdersMutation.Field()
     update_low_stock_products = UpdateLowStockProducts.Field()
-
-schema = graphene.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
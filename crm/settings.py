@@ -128,6 +128,14 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Graphene Configuration
+GRAPHENE = {
+    'SCHEMA': 'alx_backend_graphql.schema.schema',
+    'MIDDLEWARE': [
+        'crm.loaders.LoadersMiddleware',
+    ],
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
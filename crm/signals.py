@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from .models import Order
+
+OrderProduct = Order.products.through
+
+
+def _product_count_subquery():
+    """Per-order count of linked products, for use in an UPDATE."""
+    counts = (
+        OrderProduct.objects
+        .filter(order_id=OuterRef('pk'))
+        .values('order_id')
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _total_amount_subquery():
+    """Per-order sum of the linked products' prices, for use in an UPDATE."""
+    totals = (
+        OrderProduct.objects
+        .filter(order_id=OuterRef('pk'))
+        .values('order_id')
+        .annotate(total=Sum('product__price'))
+        .values('total')
+    )
+    output_field = DecimalField(max_digits=10, decimal_places=2)
+    return Coalesce(
+        Subquery(totals, output_field=output_field),
+        Value(Decimal('0.00'), output_field=output_field),
+    )
+
+
+@receiver(m2m_changed, sender=OrderProduct)
+def sync_order_totals(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep Order.product_count and Order.total_amount in step with the
+    order/product links.
+
+    Handles changes made from either side of the relation; the affected
+    orders are updated with a single UPDATE, without going through save().
+    """
+    if reverse and action == 'pre_clear':
+        # product.orders.clear(): remember which orders are about to lose it
+        instance._cleared_order_ids = list(instance.orders.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # Keep the in-memory order in step so a later save() does not undo it
+        totals = instance.products.aggregate(count=Count('pk'), total=Sum('price'))
+        instance.product_count = totals['count']
+        # SQLite hands sums back with spurious digits; keep it to cents
+        instance.total_amount = (totals['total'] or Decimal('0')).quantize(Decimal('0.01'))
+        Order.objects.filter(pk=instance.pk).update(
+            product_count=instance.product_count,
+            total_amount=instance.total_amount,
+        )
+        return
+
+    if action == 'post_clear':
+        order_ids = instance.__dict__.pop('_cleared_order_ids', [])
+    else:
+        order_ids = pk_set or []
+    if order_ids:
+        Order.objects.filter(pk__in=order_ids).update(
+            product_count=_product_count_subquery(),
+            total_amount=_total_amount_subquery(),
+        )
@@ -1,3 +1,227 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase, override_settings
+
+from alx_backend_graphql.schema import schema
+
+from .models import Customer, Order, Product
+
+
+def execute(query, variables=None):
+    """Run a GraphQL operation in-process against a fresh request context."""
+    request = RequestFactory().post('/graphql/')
+    return schema.execute(query, variable_values=variables, context_value=request)
+
+
+class SyncOrderTotalsTests(TestCase):
+    """Order.total_amount and product_count follow the order/product links."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(name='Alice', email='alice@example.com')
+        cls.laptop = Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        cls.mouse = Product.objects.create(name='Mouse', price=Decimal('25.50'), stock=10)
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=self.customer)
+
+    def assertTotals(self, order, total_amount, product_count):
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, total_amount)
+        self.assertEqual(order.product_count, product_count)
+
+    def test_add(self):
+        self.order.products.add(self.laptop, self.mouse)
+        self.assertTotals(self.order, Decimal('1025.49'), 2)
+
+    def test_add_updates_instance(self):
+        self.order.products.add(self.mouse)
+        self.assertEqual(self.order.total_amount, Decimal('25.50'))
+        self.assertEqual(self.order.product_count, 1)
+
+    def test_remove(self):
+        self.order.products.add(self.laptop, self.mouse)
+        self.order.products.remove(self.laptop)
+        self.assertTotals(self.order, Decimal('25.50'), 1)
+
+    def test_clear(self):
+        self.order.products.add(self.laptop, self.mouse)
+        self.order.products.clear()
+        self.assertTotals(self.order, Decimal('0.00'), 0)
+
+    def test_reverse_add(self):
+        other = Order.objects.create(customer=self.customer)
+        self.order.products.add(self.mouse)
+        self.laptop.orders.add(self.order, other)
+        self.assertTotals(self.order, Decimal('1025.49'), 2)
+        self.assertTotals(other, Decimal('999.99'), 1)
+
+    def test_reverse_remove(self):
+        self.order.products.add(self.laptop, self.mouse)
+        self.laptop.orders.remove(self.order)
+        self.assertTotals(self.order, Decimal('25.50'), 1)
+
+    def test_reverse_clear(self):
+        other = Order.objects.create(customer=self.customer)
+        self.order.products.add(self.laptop, self.mouse)
+        other.products.add(self.laptop)
+        self.laptop.orders.clear()
+        self.assertTotals(self.order, Decimal('25.50'), 1)
+        self.assertTotals(other, Decimal('0.00'), 0)
+
+    def test_create_order_mutation(self):
+        result = execute(
+            '''
+            mutation($input: OrderInput!) {
+                createOrder(input: $input) {
+                    order { totalAmount productCount }
+                    errors { field message }
+                }
+            }
+            ''',
+            {'input': {
+                'customerId': str(self.customer.pk),
+                'productIds': [str(self.laptop.pk), str(self.mouse.pk), str(self.laptop.pk)],
+            }},
+        )
+        self.assertIsNone(result.errors)
+        self.assertIsNone(result.data['createOrder']['errors'])
+
+        order = Order.objects.exclude(pk=self.order.pk).get()
+        self.assertTotals(order, Decimal('1025.49'), 2)
+        self.assertEqual(order.calculate_total_amount(), Decimal('1025.49'))
+        self.assertEqual(order.products.count(), 2)
+
+
+class BulkCreateOrdersMutationTests(TestCase):
+    """bulkCreateOrders creates the valid orders and reports the rest."""
+
+    MUTATION = '''
+        mutation($input: [OrderInput]!) {
+            bulkCreateOrders(input: $input) {
+                orders { totalAmount productCount }
+                errors { field message }
+            }
+        }
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Customer.objects.create(name='Alice', email='alice@example.com')
+        cls.bob = Customer.objects.create(name='Bob', email='bob@example.com')
+        cls.laptop = Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        cls.mouse = Product.objects.create(name='Mouse', price=Decimal('25.50'), stock=10)
+
+    def bulk_create(self, *orders):
+        result = execute(self.MUTATION, {'input': list(orders)})
+        self.assertIsNone(result.errors)
+        return result.data['bulkCreateOrders']
+
+    def order_input(self, customer, *products):
+        return {
+            'customerId': str(customer.pk),
+            'productIds': [str(product.pk) for product in products],
+        }
+
+    def test_bad_customer_id(self):
+        data = self.bulk_create(
+            self.order_input(self.alice, self.laptop),
+            {'customerId': 'not-a-uuid', 'productIds': [str(self.mouse.pk)]},
+            self.order_input(self.bob, self.mouse),
+        )
+        self.assertEqual(len(data['orders']), 2)
+        self.assertEqual(data['errors'], [
+            {'field': 'order_1_customerId', 'message': 'Customer does not exist'},
+        ])
+        self.assertEqual(
+            sorted(Order.objects.values_list('customer__name', flat=True)),
+            ['Alice', 'Bob'],
+        )
+
+    def test_bad_product_id(self):
+        missing = '00000000-0000-0000-0000-000000000000'
+        data = self.bulk_create(
+            {'customerId': str(self.alice.pk), 'productIds': [str(self.laptop.pk), missing]},
+            self.order_input(self.bob, self.mouse),
+        )
+        self.assertEqual(len(data['orders']), 1)
+        self.assertEqual(data['errors'], [
+            {'field': 'order_0_productIds', 'message': f'Invalid product IDs: {missing}'},
+        ])
+        order = Order.objects.get()
+        self.assertEqual(order.customer, self.bob)
+        self.assertEqual(list(order.products.all()), [self.mouse])
+
+    def test_duplicate_product_ids(self):
+        data = self.bulk_create(self.order_input(self.alice, self.laptop, self.mouse, self.laptop))
+        self.assertEqual(data['errors'], [])
+        self.assertEqual(data['orders'], [{'totalAmount': '1025.49', 'productCount': 2}])
+        self.assertEqual(Order.objects.get().products.count(), 2)
+
+    def test_stored_totals_match_calculate_total_amount(self):
+        self.bulk_create(
+            self.order_input(self.alice, self.laptop),
+            self.order_input(self.alice, self.laptop, self.mouse),
+            self.order_input(self.bob, self.mouse),
+        )
+        orders = Order.objects.all()
+        self.assertEqual(len(orders), 3)
+        for order in orders:
+            # calculate_total_amount() overwrites the field, so read it first
+            stored_total = order.total_amount
+            self.assertEqual(stored_total, order.calculate_total_amount())
+            self.assertEqual(order.product_count, order.products.count())
+
+
+class PartlyHyphenatedIdTests(TestCase):
+    """IDs that uuid.UUID accepts with hyphens missing still resolve."""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(name='Alice', email='alice@example.com')
+        cls.product = Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        cls.order = Order.objects.create(customer=customer)
+        cls.order.products.add(cls.product)
+        # Only the hyphens between the second and third groups are left out
+        hyphenated = str(cls.product.pk)
+        cls.product_id = hyphenated[:13] + hyphenated[14:]
+
+    def test_filter(self):
+        result = execute(
+            'query($id: String) { orders(containsProduct: $id) { edges { node { productCount } } } }',
+            {'id': self.product_id},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['orders']['edges'], [{'node': {'productCount': 1}}])
+
+    def test_get_by_id(self):
+        result = execute('query($id: ID!) { product(id: $id) { name } }', {'id': self.product_id})
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['product'], {'name': 'Laptop'})
+
+
+@override_settings(CRM_INTERNAL_TOKEN='')
+class InternalGraphQLEndpointTests(TestCase):
+    """/graphql/internal/ skips CSRF, so it only answers the server's own scripts."""
+
+    def post(self, **extra):
+        return self.client.post(
+            '/graphql/internal/',
+            {'query': '{ crmStats { totalCustomers } }'},
+            content_type='application/json',
+            **extra,
+        )
+
+    def test_remote_client_rejected(self):
+        self.assertEqual(self.post(REMOTE_ADDR='203.0.113.7').status_code, 403)
+
+    def test_loopback_client_allowed_without_token(self):
+        response = self.post(REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'data': {'crmStats': {'totalCustomers': 0}}})
+
+    @override_settings(CRM_INTERNAL_TOKEN='s3cret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.post(REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.post(HTTP_X_CRM_INTERNAL_TOKEN='wrong').status_code, 403)
+        self.assertEqual(self.post(HTTP_X_CRM_INTERNAL_TOKEN='s3cret').status_code, 200)
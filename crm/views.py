@@ -1,3 +1,33 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1'}
 
 # Create your views here.
+
+def healthz(request):
+    """Liveness probe: answers without touching the GraphQL schema or the database."""
+    return HttpResponse(b'ok', content_type='text/plain')
+
+
+def internal_only(view):
+    """
+    Restrict a view to the server's own scripts: callers must send
+    settings.CRM_INTERNAL_TOKEN in the X-CRM-Internal-Token header, or come
+    from a loopback address while no token is configured.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        token = settings.CRM_INTERNAL_TOKEN
+        if token:
+            allowed = constant_time_compare(request.META.get('HTTP_X_CRM_INTERNAL_TOKEN', ''), token)
+        else:
+            allowed = request.META.get('REMOTE_ADDR') in LOOPBACK_ADDRESSES
+        if not allowed:
+            return HttpResponseForbidden()
+        return view(request, *args, **kwargs)
+    return wrapped
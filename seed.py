@@ -10,7 +10,7 @@ Usage:
 import os
 import sys
 import django
-from decimal import Decimal
+from django.db import connection, transaction
 from datetime import datetime, timedelta
 import random
 
@@ -18,15 +18,28 @@ import random
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
 django.setup()
 
+from crm._seed_data import CUSTOMERS, PRODUCTS
 from crm.models import Customer, Product, Order
 
+# Rows per INSERT for the bulk_create calls below
+BULK_BATCH_SIZE = int(os.environ.get('CRM_BULK_BATCH_SIZE', 500))
+
 
 def clear_data():
     """Clear existing data from the database."""
     print("Clearing existing data...")
-    Order.objects.all().delete()
-    Product.objects.all().delete()
-    Customer.objects.all().delete()
+    if connection.vendor == 'postgresql':
+        # One TRUNCATE instead of row-by-row cascading deletes
+        tables = [
+            model._meta.db_table
+            for model in (Order.products.through, Order, Product, Customer)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE TABLE {', '.join(map(connection.ops.quote_name, tables))} CASCADE")
+    else:
+        Order.objects.all().delete()
+        Product.objects.all().delete()
+        Customer.objects.all().delete()
     print("✓ Data cleared successfully!")
 
 
@@ -34,64 +47,10 @@ def create_customers():
     """Create sample customers."""
     print("Creating customers...")
     
-    customers_data = [
-        {
-            'name': 'Alice Johnson',
-            'email': 'alice.johnson@example.com',
-            'phone': '+1234567890'
-        },
-        {
-            'name': 'Bob Smith',
-            'email': 'bob.smith@example.com',
-            'phone': '123-456-7890'
-        },
-        {
-            'name': 'Carol Williams',
-            'email': 'carol.williams@example.com',
-            'phone': '+1987654321'
-        },
-        {
-            'name': 'David Brown',
-            'email': 'david.brown@example.com',
-            'phone': '987-654-3210'
-        },
-        {
-            'name': 'Eva Davis',
-            'email': 'eva.davis@example.com',
-            'phone': '+1122334455'
-        },
-        {
-            'name': 'Frank Miller',
-            'email': 'frank.miller@example.com',
-            'phone': '555-123-4567'
-        },
-        {
-            'name': 'Grace Wilson',
-            'email': 'grace.wilson@example.com',
-            'phone': '+1999888777'
-        },
-        {
-            'name': 'Henry Taylor',
-            'email': 'henry.taylor@example.com',
-            'phone': '444-555-6666'
-        },
-        {
-            'name': 'Ivy Anderson',
-            'email': 'ivy.anderson@example.com',
-            'phone': '+1777666555'
-        },
-        {
-            'name': 'Jack Thomas',
-            'email': 'jack.thomas@example.com',
-            'phone': '333-222-1111'
-        }
-    ]
-    
-    customers = []
-    for customer_data in customers_data:
-        customer = Customer.objects.create(**customer_data)
-        customers.append(customer)
-        print(f"  ✓ Created customer: {customer.name}")
+    customers = [Customer(**customer_data) for customer_data in CUSTOMERS[:10]]
+    for customer in customers:
+        customer.sync_phone_sanitized()
+    customers = Customer.objects.bulk_create(customers, batch_size=BULK_BATCH_SIZE)
     
     print(f"✓ Created {len(customers)} customers successfully!")
     return customers
@@ -101,89 +60,10 @@ def create_products():
     """Create sample products."""
     print("Creating products...")
     
-    products_data = [
-        {
-            'name': 'MacBook Pro 16"',
-            'price': Decimal('2499.99'),
-            'stock': 15
-        },
-        {
-            'name': 'Dell XPS 13',
-            'price': Decimal('1299.99'),
-            'stock': 25
-        },
-        {
-            'name': 'iPhone 15 Pro',
-            'price': Decimal('999.99'),
-            'stock': 50
-        },
-        {
-            'name': 'Samsung Galaxy S24',
-            'price': Decimal('899.99'),
-            'stock': 40
-        },
-        {
-            'name': 'iPad Air',
-            'price': Decimal('599.99'),
-            'stock': 30
-        },
-        {
-            'name': 'AirPods Pro',
-            'price': Decimal('249.99'),
-            'stock': 100
-        },
-        {
-            'name': 'Sony WH-1000XM5',
-            'price': Decimal('399.99'),
-            'stock': 20
-        },
-        {
-            'name': 'Microsoft Surface Pro',
-            'price': Decimal('1199.99'),
-            'stock': 18
-        },
-        {
-            'name': 'Apple Watch Series 9',
-            'price': Decimal('429.99'),
-            'stock': 35
-        },
-        {
-            'name': 'Nintendo Switch OLED',
-            'price': Decimal('349.99'),
-            'stock': 45
-        },
-        {
-            'name': 'LG 27" 4K Monitor',
-            'price': Decimal('449.99'),
-            'stock': 12
-        },
-        {
-            'name': 'Logitech MX Master 3',
-            'price': Decimal('99.99'),
-            'stock': 60
-        },
-        {
-            'name': 'Mechanical Keyboard',
-            'price': Decimal('159.99'),
-            'stock': 25
-        },
-        {
-            'name': 'Webcam HD 1080p',
-            'price': Decimal('79.99'),
-            'stock': 40
-        },
-        {
-            'name': 'Bluetooth Speaker',
-            'price': Decimal('129.99'),
-            'stock': 55
-        }
-    ]
-    
-    products = []
-    for product_data in products_data:
-        product = Product.objects.create(**product_data)
-        products.append(product)
-        print(f"  ✓ Created product: {product.name} - ${product.price}")
+    products = Product.objects.bulk_create(
+        [Product(**product_data) for product_data in PRODUCTS[:15]],
+        batch_size=BULK_BATCH_SIZE,
+    )
     
     print(f"✓ Created {len(products)} products successfully!")
     return products
@@ -194,52 +74,64 @@ def create_orders(customers, products):
     print("Creating orders...")
     
     orders = []
-    
-    # Create 20 random orders
-    for i in range(20):
-        # Select random customer
-        customer = random.choice(customers)
-        
-        # Select 1-4 random products for each order
-        num_products = random.randint(1, 4)
-        selected_products = random.sample(products, num_products)
+    order_products = []
+    order_dates = []
+    # Looked up by index in the loop below
+    prices = [product.price for product in products]
+    # Order dates are counted back from a single now()
+    now = datetime.now()
+    
+    # Create 20 random orders, each with a random customer and 1-4 random
+    # products; the customers and order sizes are drawn up front
+    order_customers = random.choices(customers, k=20)
+    order_sizes = [random.randint(1, 4) for _ in range(20)]
+    for customer, num_products in zip(order_customers, order_sizes):
+        selected_idxs = random.sample(range(len(products)), num_products)
+        selected_products = [products[j] for j in selected_idxs]
         
         # Create order with random date in the last 30 days
         days_ago = random.randint(0, 30)
-        order_date = datetime.now() - timedelta(days=days_ago)
-        
-        # Create the order
-        order = Order.objects.create(customer=customer)
-        order.products.set(selected_products)
-        
-        # Calculate total amount
-        total = sum(product.price for product in selected_products)
-        order.total_amount = total
-        order.save(update_fields=['total_amount'])
-        
-        # Update the created_at and order_date to the random date
-        Order.objects.filter(id=order.id).update(
-            order_date=order_date,
-            created_at=order_date
-        )
+        order_dates.append(now - timedelta(days=days_ago))
         
-        orders.append(order)
-        product_names = [p.name for p in selected_products]
-        print(f"  ✓ Created order for {customer.name}: {', '.join(product_names)} - ${total}")
+        orders.append(Order(
+            customer=customer,
+            total_amount=sum(prices[j] for j in selected_idxs),
+            product_count=num_products,
+        ))
+        order_products.append(selected_products)
+    
+    # Two INSERT statements for all the orders and their product links
+    OrderProduct = Order.products.through
+    orders = Order.objects.bulk_create(orders, batch_size=BULK_BATCH_SIZE)
+    OrderProduct.objects.bulk_create(
+        [
+            OrderProduct(order_id=order.pk, product_id=product.pk)
+            for order, selected_products in zip(orders, order_products)
+            for product in selected_products
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    
+    # order_date/created_at are auto_now_add, so bulk_create stamped them
+    # with now(); bulk_update writes the random dates in one CASE/WHEN UPDATE
+    for order, order_date in zip(orders, order_dates):
+        order.order_date = order.created_at = order_date
+    Order.objects.bulk_update(orders, ['order_date', 'created_at'], batch_size=BULK_BATCH_SIZE)
     
     print(f"✓ Created {len(orders)} orders successfully!")
     return orders
 
 
-def print_summary():
+def print_summary(customers, products, orders):
     """Print a summary of created data."""
     print("\n" + "="*60)
     print("DATABASE SEEDING COMPLETED!")
     print("="*60)
     
-    customer_count = Customer.objects.count()
-    product_count = Product.objects.count()
-    order_count = Order.objects.count()
+    # main() clears the tables first, so the created lists are the totals
+    customer_count = len(customers)
+    product_count = len(products)
+    order_count = len(orders)
     
     print(f"Total Customers: {customer_count}")
     print(f"Total Products: {product_count}")
@@ -255,9 +147,9 @@ def print_summary():
         print(f"  - {product.name}: ${product.price} (Stock: {product.stock})")
     
     print("\nSample Orders:")
-    for order in Order.objects.all()[:5]:
-        product_count = order.products.count()
-        print(f"  - Order #{str(order.id)[:8]}... for {order.customer.name}: {product_count} products, Total: ${order.total_amount}")
+    # product_count is stored on the order, so this is a single JOINed query
+    for order in Order.objects.select_related('customer')[:5]:
+        print(f"  - Order #{str(order.id)[:8]}... for {order.customer.name}: {order.product_count} products, Total: ${order.total_amount}")
     
     print("\n" + "="*60)
     print("You can now test your GraphQL mutations and queries!")
@@ -274,13 +166,14 @@ def main():
         # Clear existing data
         clear_data()
         
-        # Create new data
-        customers = create_customers()
-        products = create_products()
-        orders = create_orders(customers, products)
+        # Create new data in one transaction (and one commit)
+        with transaction.atomic():
+            customers = create_customers()
+            products = create_products()
+            orders = create_orders(customers, products)
         
         # Print summary
-        print_summary()
+        print_summary(customers, products, orders)
         
     except Exception as e:
         print(f"❌ Error during seeding: {str(e)}")
@@ -5,13 +5,13 @@ Simple seeding script for CRM data
 import os
 import sys
 import django
-from decimal import Decimal
 
 # Setup Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
 django.setup()
 
 # Now import models
+from crm._seed_data import CUSTOMERS, PRODUCTS
 from crm.models import Customer, Product, Order
 
 def main():
@@ -24,33 +24,33 @@ def main():
     print("Cleared existing data")
     
     # Create customers
-    customers = [
-        Customer.objects.create(name="Alice Johnson", email="alice@example.com", phone="+1234567890"),
-        Customer.objects.create(name="Bob Smith", email="bob@example.com", phone="123-456-7890"),
-        Customer.objects.create(name="Carol Williams", email="carol@example.com", phone="+1987654321"),
-    ]
+    customers = [Customer(**data) for data in CUSTOMERS[:3]]
+    for customer in customers:
+        customer.sync_phone_sanitized()
+    customers = Customer.objects.bulk_create(customers)
     print(f"Created {len(customers)} customers")
     
     # Create products
-    products = [
-        Product.objects.create(name="MacBook Pro", price=Decimal('2499.99'), stock=10),
-        Product.objects.create(name="iPhone 15", price=Decimal('999.99'), stock=25),
-        Product.objects.create(name="iPad Air", price=Decimal('599.99'), stock=15),
-        Product.objects.create(name="AirPods Pro", price=Decimal('249.99'), stock=50),
-    ]
+    products = Product.objects.bulk_create([Product(**data) for data in PRODUCTS[:4]])
     print(f"Created {len(products)} products")
     
     # Create orders
-    orders = []
-    for i, customer in enumerate(customers):
-        order = Order.objects.create(customer=customer)
-        # Add some products to each order
-        order.products.set(products[:2])  # Add first 2 products to each order
-        # Calculate total
-        total = sum(p.price for p in order.products.all())
-        order.total_amount = total
-        order.save()
-        orders.append(order)
+    # Add the first 2 products to each order
+    order_products = products[:2]
+    orders = Order.objects.bulk_create([
+        Order(
+            customer=customer,
+            total_amount=sum(p.price for p in order_products),
+            product_count=len(order_products),
+        )
+        for customer in customers
+    ])
+    OrderProduct = Order.products.through
+    OrderProduct.objects.bulk_create([
+        OrderProduct(order_id=order.pk, product_id=product.pk)
+        for order in orders
+        for product in order_products
+    ])
     
     print(f"Created {len(orders)} orders")
     print("Seeding completed successfully!")
@@ -2,10 +2,12 @@
 import os
 import sys
 import django
+from django.apps import apps
 
-# Setup Django
+# Setup Django, unless a caller already has
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
 try:
     from crm.models import Customer, Product, Order
@@ -16,15 +18,14 @@ try:
     cursor = connection.cursor()
     print("✓ Database connection successful")
     
-    # Check if tables exist
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'crm_%';")
-    tables = cursor.fetchall()
-    print(f"✓ Found tables: {[table[0] for table in tables]}")
+    # Check if tables exist (works on any backend, not just SQLite)
+    tables = [table for table in connection.introspection.table_names(cursor) if table.startswith('crm_')]
+    print(f"✓ Found tables: {tables}")
     
-    # Count existing records
-    customer_count = Customer.objects.count()
-    product_count = Product.objects.count()
-    order_count = Order.objects.count()
+    # Count existing records, all three in one round trip
+    count_tables = [connection.ops.quote_name(model._meta.db_table) for model in (Customer, Product, Order)]
+    cursor.execute("SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table})" for table in count_tables))
+    customer_count, product_count, order_count = cursor.fetchone()
     
     print(f"✓ Current data counts:")
     print(f"  - Customers: {customer_count}")